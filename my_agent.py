@@ -3,9 +3,22 @@ __organization__ = "COSC343/AIML402, University of Otago"
 __email__ = "hanca804@student.otago.ac.nz"
 __date__ = "July 2022"
 
-import helper
 import numpy as np
 
+def argmax(scores):
+   """
+   Returns the index of the first instance of the max score. Small arrays (common
+   late in a game) are searched in plain Python since np.argmax spends more time
+   on its call overhead than on the search itself for those.
+
+   :param scores: float array of scores
+   :return: int - the index of the highest score
+   """
+   if len(scores) > 64:
+      return int(np.argmax(scores))
+   scores = scores.tolist()
+   return scores.index(max(scores))
+
 class WordleAgent():
    """
        A class that encapsulates the code dictating the
@@ -15,8 +28,9 @@ class WordleAgent():
 
        Attributes
        ----------
-       dictionary : list
-           a list of valid words for the game
+       dictionary : numpy.ndarray
+           an object array of valid words for the game, so it can be indexed
+           with arrays of word indexes
        letter : list
            a list containing valid characters in the game
        word_length : int
@@ -39,20 +53,31 @@ class WordleAgent():
       :param word_length: the number of letters per guess word
       :param num_guesses: the max. number of guesses per game
       :param mode: indicates whether the game is played in 'easy' or 'hard' mode
-      Also adds a backup dictionary that gets reduced/rebuilt each round, a data
-      field for the index of the first guess that gets determined once and reused,
-      and an instance data field for the guess counter to see if that ever gets
-      out of sync with the one given by the percepts.
+      Also encodes the dictionary as a matrix of letter codes once (marking the
+      words with double letters while at it), keeps the indexes of the words that
+      are still possible solutions (reduced/rebuilt each round), a data field for
+      the index of the first guess that gets determined once and reused, and an
+      instance data field for the guess counter to see if that ever gets out of
+      sync with the one given by the percepts.
       """
 
-      self.dictionary = dictionary
-      self.dictionary_backup = dictionary.copy()
+      self.dictionary = np.asarray(dictionary, dtype=object)
       self.letters = letters
       self.word_length = word_length
       self.num_guesses = num_guesses
       self.mode = mode
-      self.first_guess_index = 0
+      self.first_guess_index = None
       self.last_guess_counter = 0
+      code_points = [ord(letter) for letter in letters]
+      self.letter_lookup = np.zeros(max(code_points) + 1, dtype=np.uint8)
+      self.letter_lookup[code_points] = np.arange(len(letters))
+      self.positions = np.arange(word_length)
+      self.all_codes = self.encode(dictionary)
+      self.alive = np.arange(len(dictionary), dtype=np.int32)
+      self.codes = self.all_codes[self.alive]
+      self.best = -1
+      sorted_codes = np.sort(self.all_codes, axis=1)
+      self.has_double = (sorted_codes[:, 1:] == sorted_codes[:, :-1]).any(axis=1)
 
 
    def AgentFunction(self, percepts):
@@ -76,79 +101,68 @@ class WordleAgent():
       # Incrementing class-wide counter to keep track of synchronization
       self.last_guess_counter += 1
 
-      # Calls a function that is only run once in the whole programme that
-      # gets the index of the best first guess, used for every round.
-      self.get_first_guess()
-
-      # Refills the secondary dictionary if it is the first round, if not
+      # Refills the possible solutions if it is the first round, if not
       # it calls the reduce possible guesses method
       if guess_counter == 0:
          self.last_guess_counter = 0
-         self.dictionary_backup = self.dictionary.copy()
-         return self.dictionary_backup[self.first_guess_index]
+         self.alive = np.arange(len(self.dictionary), dtype=np.int32)
+         self.codes = self.all_codes[self.alive]
+         # Gets the index of the best first guess the first time this agent plays,
+         # then reuses it for every round. The entropies are only needed for that,
+         # later guesses rebuild them in reduce_guesses.
+         if self.first_guess_index is None:
+            self.update_entropies()
+            self.get_first_guess()
+         self.best = self.first_guess_index
+         return self.dictionary[self.first_guess_index]
       else:
          self.reduce_guesses(percepts)
 
       # Checks if the instance guess counter is out of sync with the one in the
       # percepts. If this is the case, we know that a guess hasn't been accepted.
       # E.g., hard mode conditions not fulfilled. So we get rid of the index of the
-      # last guess.
+      # last guess, which is kept in self.best.
       if guess_counter != self.last_guess_counter:
-         scores = self.calculate_scores()
-         max_index = np.argmax(scores)
-         self.dictionary_backup.remove(self.dictionary_backup[max_index])
+         self.alive = self.alive[self.alive != self.best]
+         self.codes = self.all_codes[self.alive]
+         self.update_entropies()
 
 
       # This portion of the code does the narrowing down of what the best next guess
       # will be based on the narrowed down dictionary. This is split between checking
       # if it is stuck in a situation like _RAIN or just giving scores to each word
       # left in the dictionary.
-      if len(self.dictionary_backup) > 0:
+      if len(self.alive) > 0:
          # Checks to see whether we can develop a clever guess for to avoid guessing
          # "DRAIN", "TRAIN", "BRAIN", only to find the solution is "CRAIN".
-         if self.mode == 'easy' and len(self.dictionary_backup) > 2 and guess_counter != self.num_guesses - 1:
+         if self.mode == 'easy' and len(self.alive) > 2 and guess_counter != self.num_guesses - 1:
             num_greens = self.green_counter(percepts)
             if num_greens == self.word_length - 1:
                guess = self.smart_guess(percepts)
                return guess
+         # With only one or two words left every letter that differs scores the same,
+         # so the double letter penalty is all that decides between them. Pick the first
+         # word without a double letter (remembering it in case it gets rejected).
+         if len(self.alive) <= 2:
+            self.best = self.alive[np.argmin(self.has_double[self.alive])]
+            return self.dictionary[self.best]
          # If not we use our scoring algorithms that take advantage of a basic probability /
          # entropy method and return the first instance of the max score.
          scores = self.calculate_scores()
-         max_index = np.argmax(scores)
-         return self.dictionary_backup[max_index]
-
-   def run_once(f):
-      """
-      Function that ensures helps get_first_guess literally "runs once" for the whole programme
-      even though this script gets called multiple times. I am unfamiliar with wrapper
-      functions and so this idea is from:
-      https://stackoverflow.com/questions/4103773/efficient-way-of-having-a-function-only-execute-once-in-a-loop
+         max_index = argmax(scores)
+         self.best = self.alive[max_index]
+         return self.dictionary[self.best]
 
-      It does not help with the algorithm itself, it only helps in ensuring that the first
-      guess is only determined once (this can take a few minutes), then after this it reuses
-      it every time.
-
-      :return: some function that ensures run_once only runs once.
-      """
-      def wrapper(*args, **kwargs):
-         if not wrapper.has_run:
-            wrapper.has_run = True
-            return f(*args, **kwargs)
-
-      wrapper.has_run = False
-      return wrapper
-
-   @run_once
    def get_first_guess(self):
       """
       Determines the best possible first guess from the dictionary. Uses the
-      probability / entropy functions below to score each word and picks the
+      probability / entropy scoring below to score each word and picks the
       first instance of the word that scores the highest.
 
       :return: nothing - the index of the first word is added to the data field.
       """
       scores = self.calculate_scores()
-      self.first_guess_index = np.argmax(scores)
+      self.first_guess_index = argmax(scores)
 
    def smart_guess(self, percepts):
       """
@@ -157,7 +171,7 @@ class WordleAgent():
       number of letters to try to avoid wasting guesses and get the solution in only
       two more steps. E.g. by guessing DOUBT.
 
-      Does this by adding the letters that could fill the only grey spot to an array and then
+      Does this by flagging the letters that could fill the only grey spot in an array and then
       working through the full dictionary to try and find words that include the highest number of
       these. It penalises words with double letters by 90% to encourage the most information
       possible to be found (however most often words with more than one of the letters also have
@@ -169,22 +183,12 @@ class WordleAgent():
       """
       guess_counter, letter_indexes, letter_states = percepts
       grey_pos = letter_states.index(0)
-      possible_letters = []
-      scores = []
-      for word in self.dictionary_backup:
-         possible_letters.append(word[grey_pos])
-      for i in range(len(self.dictionary)):
-         scores.append(0)
-         for char in self.dictionary[i]:
-            double_letter = False
-            if char in possible_letters:
-               scores[i] += 1
-               count = self.dictionary[i].count(char)
-               if count > 1:
-                  double_letter = True
-         if double_letter:
-            scores[i] *= 0.1
-      smart_index = np.argmax(scores)
+      possible_letters = np.zeros(len(self.letters), dtype=bool)
+      possible_letters[self.codes[:, grey_pos]] = True
+      hits = possible_letters[self.all_codes]
+      scores = hits.sum(axis=1).astype(np.float64)
+      scores[self.has_double] *= 0.1
+      smart_index = argmax(scores)
       return self.dictionary[smart_index]
 
 
@@ -200,78 +204,58 @@ class WordleAgent():
 
    def calculate_scores(self):
       """
-      Function to break up scores function that adds each word's
-      score to an array and return it. Calls the score function
-      which does the heavy lifting.
-      :return: - int array that is the size of the reduced dictionary
+      Function that scores every word left in the reduced dictionary at once.
+      Gathers the entropy of each letter appearing in its position from the
+      table built by update_entropies and sums them up to get the total word
+      score, with a penalty of 10% for words with double letters.
+      :return: - float array that is the size of the reduced dictionary
                with corresponding scores
       """
-      scores = []
-      for word in self.dictionary_backup:
-         scores.append(self.score(word))
+      scores = self.entropies[self.codes, self.positions].sum(axis=1)
+      scores *= np.where(self.has_double[self.alive], 0.9, 1.0)
       return scores
 
-
-   def score(self, word):
+   def encode(self, words):
       """
-      Function to calculate the entropy of each letter in a given word
-      and sum them up to get the total word score. Uses a penalty of 10%
-      for words with double letters.
+      Converts a list of words to a matrix of letter codes, a row per word holding
+      the index of each of its letters in self.letters. The words are joined and
+      converted to code points in one go, which are then mapped to letter indexes
+      through a lookup table rather than looking up every character separately.
 
-      :param word: is the word we are calculating the score of
-      :return: decimal for the score of the word
-      """
-      s = 0
-      double_letter = False
-      for i in range(len(word)):
-         s += self.entropy(word[i], i)
-         count = word.count(word[i])
-         if count > 1:
-            double_letter = True
-      if double_letter:
-         s *= 0.9
-      return s
-
-
-   def probability(self, char, pos):
+      :param words: a list of words of length self.word_length
+      :return: uint8 array of shape (len(words), self.word_length)
       """
-      Calculates the probability of a given character occuring
-      in a given position by taking the frequency of occurences / N
-      where N is the length of the reduced dictionary.
+      code_points = np.frombuffer(''.join(words).encode('utf-32-le'), dtype='<u4')
+      return self.letter_lookup[code_points].reshape(-1, self.word_length)
 
-      :param char: the character we are scoring
-      :param pos: the position we are investigating
-      :return: decimal for the probability that the char occurs in that position
-      """
-      freq = 0
-      for i in range(len(self.dictionary_backup)):
-         if self.dictionary_backup[i][pos] == char:
-            freq += 1
-      prob = freq / len(self.dictionary_backup)
-      return prob
-
-   def entropy(self, char, pos):
+   def update_entropies(self):
       """
-      Entropy function that uses the probability of a given character
-      appearing at a given index and normalises this so that values closest
-      to 0.5 are preferred. Idea for the formula from:
+      Rebuilds the table of entropies of a given character occuring in a given
+      position from the letter codes of the reduced dictionary. The probability p
+      is the frequency of occurences / N where N is the length of the reduced
+      dictionary, and the entropy p * (1-p) prefers values closest to 0.5. Each
+      (letter, position) entropy is worked out once per round rather than once per
+      word. Idea for the formula from:
       https://dev.to/vnjogani/the-optimal-strategy-for-solving-a-wordle-5fd7
 
-      :param char: is the car we're investigating
-      :param pos: is the position of that char
-      :return: a decimal for the entropy
+      :return: nothing - the table is added to the data fields.
       """
-      p = self.probability(char, pos)
-      e = p * (1-p)
-      return e
+      # Counts every (letter, position) pair in a single pass by flattening the
+      # pair into one bin index
+      bins = self.codes.astype(np.intp)
+      bins *= self.word_length
+      bins += self.positions
+      counts = np.bincount(bins.ravel(), minlength=len(self.letters) * self.word_length)
+      p = counts.reshape(len(self.letters), self.word_length) / max(len(self.codes), 1)
+      self.entropies = p * (1-p)
 
    def reduce_guesses(self, percepts):
       """
       Reduce guesses function that takes the information from the last
-      guess and uses it to reduce the size of the backup dictionary (the
-      list of possible solutions). This method prioritises accuracy over
-      effectiveness, meaning that we only delete words that have a grey letter
-      in that very position to avoid accidentally deleting a word that shouldn't
+      guess and uses it to reduce the indexes of the possible solutions. This
+      method prioritises accuracy over effectiveness, meaning that we only
+      delete words that have a grey letter in that very position to avoid
+      accidentally deleting a word that shouldn't
 
       Extra effectiveness is applied by counting the number of instances of that
       offending grey word and if the word we are checking only has one then we
@@ -282,29 +266,24 @@ class WordleAgent():
       of the last guess or do not contain the yellow letter at all.
 
       :param percepts: information about the last guess.
-      :return: nothing - information gets added (taken away) from  the backup dictionary
+      :return: nothing - information gets added (taken away) from  the possible solutions
       """
       guess_counter, letter_indexes, letter_states = percepts
-      dict_copy = self.dictionary_backup.copy()
-      in_english = helper.letter_indices_to_word(letter_indexes, self.letters)
-      for j in range(len(dict_copy)):
-         word = dict_copy[j]
-         for i in range(len(word)):
-            if letter_states[i] == 0:
-               if in_english[i] in word:
-                  num_instances = in_english.count(in_english[i])
-                  if num_instances == 1:
-                     self.dictionary_backup.remove(word)
-                     break
-                  else:
-                     if in_english[i] == word[i]:
-                        self.dictionary_backup.remove(word)
-                        break
-            elif letter_states[i] == 1:
-               if in_english[i] != word[i]:
-                  self.dictionary_backup.remove(word)
-                  break
-            elif letter_states[i] == -1:
-               if in_english[i] not in word or in_english[i] == word[i]:
-                  self.dictionary_backup.remove(word)
-                  break
\ No newline at end of file
+      guess = np.asarray(letter_indexes, dtype=np.uint8)
+      guess_counts = np.bincount(guess, minlength=len(self.letters))
+      codes = self.codes
+      keep = np.ones(len(codes), dtype=bool)
+      for i, letter in enumerate(guess):
+         in_place = codes[:, i] == letter
+         if letter_states[i] == 0:
+            if guess_counts[letter] == 1:
+               keep &= ~(codes == letter).any(axis=1)
+            else:
+               keep &= ~in_place
+         elif letter_states[i] == 1:
+            keep &= in_place
+         elif letter_states[i] == -1:
+            keep &= (codes == letter).any(axis=1) & ~in_place
+      self.alive = self.alive[keep]
+      self.codes = self.all_codes[self.alive]
+      self.update_entropies()